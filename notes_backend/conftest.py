@@ -0,0 +1,7 @@
+"""Pytest setup: point the app at a throwaway SQLite database before src.api is imported."""
+
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["BCRYPT_COST"] = "4"
@@ -1,17 +1,25 @@
 """JWT/OAuth2 authentication utilities for the notes app"""
 
+import hashlib
+import logging
+import ssl
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import anyio
+import bcrypt
+import jwt
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from .database import get_db
 from .models import User
-from .schemas import TokenData
 
 from dotenv import load_dotenv
 import os
@@ -19,33 +27,100 @@ import os
 # Load environment variables for JWT secret, etc.
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Config
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
-
-# Password hasher
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_COST = int(os.getenv("BCRYPT_COST", 12))  # lower (e.g. 4) only for tests/local dev
+if not 4 <= BCRYPT_COST <= 31:
+    raise ValueError(f"BCRYPT_COST must be between 4 and 31 (bcrypt's supported range), got {BCRYPT_COST}")
+
+# Dedicated limiter for bcrypt worker threads. bcrypt releases the GIL, so hashing
+# scales with cores; capping at the CPU count keeps it from starving the default pool.
+_bcrypt_limiter = anyio.CapacityLimiter(os.cpu_count() or 1)
+
+# Verified tokens: blake2b(token) -> (username, exp).
+# Lets repeat requests with the same bearer token skip jwt.decode. Tokens are not
+# revocable (no server-side state), so caching a valid one changes nothing but cost.
+_token_cache = TTLCache(maxsize=10000, ttl=30)
+_token_cache_lock = threading.Lock()
+
+# Let PyJWT reject tokens without exp/sub instead of checking for them afterwards.
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"], "verify_aud": False, "verify_iss": False}
+
+# Successful password checks: keyed blake2b(username, password, stored hash) -> True.
+# Lets quick re-logins skip bcrypt; the per-process key keeps entries useless outside it.
+# The stored hash is part of the key, so a changed password never hits an old entry.
+# Failures are never cached, so wrong guesses always pay the full bcrypt cost.
+_password_check_cache = TTLCache(maxsize=1024, ttl=60)
+_password_check_lock = threading.Lock()
+_PASSWORD_CHECK_KEY = os.urandom(32)
+
+# User lookups, built once and executed with bound parameters. The current-user
+# query loads only what the notes routes need; /users/me uses the full-row one.
+_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+_CURRENT_USER_BY_USERNAME = _USER_BY_USERNAME.options(load_only(User.id, User.username))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
 
+# PUBLIC_INTERFACE
+def log_crypto_backend():
+    """Log the OpenSSL build behind HS256 signing; warn if SHA-256 is not OpenSSL-backed."""
+    logger.info("JWT HMAC-SHA256 backend: %s", ssl.OPENSSL_VERSION)
+    # PyJWT signs via hmac.new(key, msg, hashlib.sha256), which only takes the
+    # OpenSSL EVP path (SHA-NI / ARMv8 CE) when hashlib.sha256 comes from _hashlib.
+    if getattr(hashlib.sha256, "__module__", None) != "_hashlib":
+        logger.warning("hashlib.sha256 is not OpenSSL-backed; JWT signing will use the builtin SHA-256")
+
+# PUBLIC_INTERFACE
+def warm_up():
+    """Run bcrypt and a JWT round trip once so first-call setup happens at startup, not in a request."""
+    bcrypt.checkpw(b"warmup", bcrypt.hashpw(b"warmup", bcrypt.gensalt(rounds=4)))
+    token = create_access_token({"sub": "warmup"})
+    jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options=_JWT_DECODE_OPTIONS)
+
 # PUBLIC_INTERFACE
 def verify_password(plain_password, hashed_password):
     """Check a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
 # PUBLIC_INTERFACE
 def get_password_hash(password):
     """Hash a password."""
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_COST)).decode()
+
+# PUBLIC_INTERFACE
+async def averify_password(plain_password, hashed_password):
+    """Check a password against its hash without blocking the event loop."""
+    return await anyio.to_thread.run_sync(
+        verify_password, plain_password, hashed_password, limiter=_bcrypt_limiter
+    )
+
+# PUBLIC_INTERFACE
+async def aget_password_hash(password):
+    """Hash a password without blocking the event loop."""
+    return await anyio.to_thread.run_sync(get_password_hash, password, limiter=_bcrypt_limiter)
 
 # PUBLIC_INTERFACE
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """Return user if username/password is valid, else None."""
-    user = db.query(User).filter(User.username == username).first()
-    if user is None or not verify_password(password, user.hashed_password):
+    user = (await db.execute(_USER_BY_USERNAME, {"username": username})).scalar_one_or_none()
+    if user is None:
         return None
+    key = hashlib.blake2b(
+        b"\0".join((username.encode(), password.encode(), user.hashed_password.encode())),
+        digest_size=16, key=_PASSWORD_CHECK_KEY,
+    ).digest()
+    with _password_check_lock:
+        verified = key in _password_check_cache
+    if not verified:
+        if not await averify_password(password, user.hashed_password):
+            return None
+        with _password_check_lock:
+            _password_check_cache[key] = True
     return user
 
 # PUBLIC_INTERFACE
@@ -56,29 +131,52 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-# PUBLIC_INTERFACE
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Return the user for the JWT token, or raise 401."""
+def _username_from_token(token: str) -> Optional[str]:
+    """Return the token's subject, using the verified-token cache when possible."""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+        if cached is not None:
+            username, exp = cached
+            if exp > time.time():
+                return username
+            del _token_cache[key]
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options=_JWT_DECODE_OPTIONS)
+    except jwt.InvalidTokenError:
+        return None
+    username = payload["sub"]
+    with _token_cache_lock:
+        _token_cache[key] = (username, payload["exp"])
+    return username
+
+async def _user_from_token(token: str, db: AsyncSession, statement) -> User:
+    """Run a user-by-username statement for the token's subject, or raise 401."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
+    username = _username_from_token(token)
+    if username is None:
         raise credentials_exception
-    user = db.query(User).filter(User.username == token_data.username).first()
+    user = (await db.execute(statement, {"username": username})).scalar_one_or_none()
     if user is None:
         raise credentials_exception
     return user
 
 # PUBLIC_INTERFACE
-def get_current_active_user(current_user: User = Depends(get_current_user)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
+    """Return the user (id and username only) for the JWT token, or raise 401."""
+    return await _user_from_token(token, db, _CURRENT_USER_BY_USERNAME)
+
+# PUBLIC_INTERFACE
+async def get_current_user_profile(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
+    """Return the fully loaded user for the JWT token, or raise 401."""
+    return await _user_from_token(token, db, _USER_BY_USERNAME)
+
+# PUBLIC_INTERFACE
+async def get_current_active_user(current_user: User = Depends(get_current_user)):
     """For future extension: block disabled users, etc."""
     return current_user
 
@@ -0,0 +1,43 @@
+"""Create database tables straight from the models (dev only).
+
+Usage, from notes_backend/: python -m src.api.create_tables
+The database is stamped at the Alembic head revision afterwards, so later
+`alembic upgrade head` runs apply only newer migrations.
+
+For production, run `alembic upgrade head` once before starting workers. Databases
+created by the old startup `create_all` (before migrations existed) match revision
+0001: run `alembic stamp 0001` once, then `alembic upgrade head`.
+"""
+
+import asyncio
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from .database import engine
+from .models import Base
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+
+def _create_and_stamp(connection):
+    Base.metadata.create_all(connection)
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.attributes["connection"] = connection
+    command.stamp(config, "head")
+
+
+# PUBLIC_INTERFACE
+async def create_tables():
+    """Create any tables that do not exist yet and mark the schema as Alembic head."""
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(_create_and_stamp)
+
+
+if __name__ == "__main__":
+    asyncio.run(create_tables())
@@ -1,8 +1,8 @@
 """Database connection and session handling for notes_backend"""
 
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from dotenv import load_dotenv
 
@@ -12,16 +12,37 @@ load_dotenv()
 # Database URL should be set via environment variable DATABASE_URL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+# The app talks to the database through asyncio drivers. DATABASE_URL stays a plain
+# URL, so map the default drivers to their async counterparts.
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# PUBLIC_INTERFACE
+def to_async_url(url):
+    """Return the URL with a default sync driver swapped for its asyncio counterpart."""
+    url = make_url(url)
+    return url.set(drivername=_ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+
+# Pool tuning for server databases; SQLite keeps SQLAlchemy's default pool.
+pool_args = {} if ASYNC_DATABASE_URL.get_backend_name() == "sqlite" else {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 50)),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 50)),
+    "pool_pre_ping": True,
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    "pool_use_lifo": True,
+}
+
+engine = create_async_engine(ASYNC_DATABASE_URL, **pool_args)
+# Keep loaded attributes after commit so write routes can return the object without a refresh SELECT.
+SessionLocal = async_sessionmaker(autoflush=False, bind=engine, expire_on_commit=False)
 
 # PUBLIC_INTERFACE
-def get_db():
-    """Gets a SQLAlchemy DB session for FastAPI dependency injection."""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Gets an async SQLAlchemy DB session for FastAPI dependency injection."""
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -1,26 +1,35 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Query, Path, Body
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Path, Body, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, bindparam, insert, select, tuple_, update
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import logging
+from datetime import datetime
+from functools import lru_cache
 from typing import List, Optional
 
-from .models import Base, User, Note
+from .models import User, Note
 from .database import engine, get_db
 from .schemas import (
     UserCreate, UserOut,
     Token,
-    NoteCreate, NoteUpdate, NoteOut,
+    NoteCreate, NoteUpdate, NoteOut, NoteListAdapter,
     Message,
 )
 from .auth import (
-    authenticate_user, get_password_hash, create_access_token,
-    get_current_active_user,
+    authenticate_user, aget_password_hash, create_access_token,
+    get_current_active_user, get_current_user_profile, log_crypto_backend, warm_up,
 )
 
 app = FastAPI(
     title="NoteMaster Backend",
     description="API for a fullstack notes app - user authentication and notes management.",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
     openapi_tags=[
         {"name": "auth", "description": "User authentication & registration"},
         {"name": "notes", "description": "Notes CRUD, search, sort, filter"},
@@ -34,18 +43,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
+def _configure_logging():
+    """Give the app's loggers an INFO handler unless logging is already configured."""
+    app_logger = logging.getLogger(__package__)
+    if not app_logger.hasHandlers():
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(levelname)s:     %(message)s"))
+        app_logger.addHandler(handler)
+        app_logger.setLevel(logging.INFO)
+
 # PUBLIC_INTERFACE
 @app.on_event("startup")
 def on_startup():
-    """Create database tables if they do not exist (dev only). For production, use Alembic migrations."""
-    Base.metadata.create_all(bind=engine)
+    """Process startup hook. Schema is managed by Alembic (`python -m src.api.create_tables` for dev)."""
+    _configure_logging()
+    log_crypto_backend()
+    warm_up()
+
+# PUBLIC_INTERFACE
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Close pooled database connections."""
+    await engine.dispose()
 
 # PUBLIC_INTERFACE
 @app.get("/", tags=["health"], summary="Health Check", description="API health check endpoint.")
-def health_check():
+async def health_check():
     """Health check endpoint."""
     return {"message": "Healthy"}
 
@@ -58,30 +85,32 @@ def health_check():
 @app.post("/auth/register", response_model=UserOut, status_code=201, tags=["auth"],
           summary="Register new user",
           description="Register a new user (username, email, password required).")
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
-    if db.query(User).filter((User.username == user_in.username) | (User.email == user_in.email)).first():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username or email is already registered"
-        )
     user = User(
         username=user_in.username,
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await aget_password_hash(user_in.password),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    # Rely on the unique username/email constraints instead of a pre-check SELECT.
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username or email is already registered"
+        )
     return user
 
 # PUBLIC_INTERFACE
 @app.post("/auth/token", response_model=Token, tags=["auth"],
           summary="Login & obtain token",
           description="Obtain JWT access token via username & password (OAuth2 password flow).")
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """Get JWT token for login using username & password."""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -102,8 +131,8 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
 @app.get("/users/me", response_model=UserOut, tags=["auth"],
          summary="Get current user profile",
          description="Get the current logged-in user's profile by JWT token.")
-def read_users_me(
-    current_user: User = Depends(get_current_active_user)
+async def read_users_me(
+    current_user: User = Depends(get_current_user_profile)
 ):
     """Returns current user's profile."""
     return current_user
@@ -113,71 +142,114 @@ def read_users_me(
 # NOTES ROUTES
 # -----------
 
+_NOTE_SORT_COLUMNS = {"created": Note.created_at, "title": Note.title}
+
+# SQLite keeps server-side CURRENT_TIMESTAMP as 'YYYY-MM-DD HH:MM:SS' text; bind cursor
+# timestamps in that same format there so the keyset comparison matches equal values.
+_CURSOR_TIMESTAMP = DateTime(timezone=True).with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
+
+
+@lru_cache(maxsize=None)
+def _list_notes_statement(sort: str, search: bool, paged: bool):
+    """Build the list_notes SELECT once per (sort, search, paged) variant; values are bound per call."""
+    column = _NOTE_SORT_COLUMNS[sort.lstrip('-')]
+    descending = sort.startswith('-')
+    stmt = select(Note).where(Note.owner_id == bindparam("owner_id"))
+    if search:
+        stmt = stmt.where(Note.title.ilike(bindparam("pattern")))
+    if paged:
+        # Keyset pagination: resume strictly after the (sort value, id) of the previous page's last row.
+        key = tuple_(column, Note.id)
+        value_type = _CURSOR_TIMESTAMP if sort.lstrip('-') == 'created' else column.type
+        cursor = tuple_(bindparam("after_value", type_=value_type), bindparam("after_id"))
+        stmt = stmt.where(key < cursor if descending else key > cursor)
+    order = (column.desc(), Note.id.desc()) if descending else (column, Note.id)
+    return stmt.order_by(*order).limit(bindparam("limit"))
+
+
+def _encode_cursor(note: Note, sort: str) -> str:
+    """Encode the sort position of a note as an opaque page cursor."""
+    value = note.created_at.isoformat() if sort.lstrip('-') == 'created' else note.title
+    return urlsafe_b64encode(f"{value}|{note.id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort: str):
+    """Return the (sort value, id) pair encoded in a page cursor, or raise 400."""
+    try:
+        value, note_id = urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        if sort.lstrip('-') == 'created':
+            value = datetime.fromisoformat(value)
+        note_id = int(note_id)
+    except ValueError:
+        raise HTTPException(400, detail="Invalid cursor")
+    # Ids are 32-bit INTEGER columns; anything outside that range would fail at bind time.
+    if not 0 < note_id <= 2**31 - 1:
+        raise HTTPException(400, detail="Invalid cursor")
+    return value, note_id
+
 # PUBLIC_INTERFACE
 @app.post("/notes/", response_model=NoteOut, status_code=201, tags=["notes"],
           summary="Create note",
           description="Create a new note belonging to the current user.")
-def create_note(
+async def create_note(
     note_in: NoteCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a note for the current user."""
-    note = Note(
-        title=note_in.title,
-        content=note_in.content,
-        owner_id=current_user.id,
-    )
-    db.add(note)
-    db.commit()
-    db.refresh(note)
+    note = (await db.execute(
+        insert(Note)
+        .values(title=note_in.title, content=note_in.content, owner_id=current_user.id)
+        .returning(Note)
+    )).scalar_one()
+    await db.commit()
     return note
 
 # PUBLIC_INTERFACE
-@app.get("/notes/", response_model=List[NoteOut], tags=["notes"],
+@app.get("/notes/", response_model=None, responses={200: {"model": List[NoteOut]}}, tags=["notes"],
          summary="List/search notes",
          description="""Return all notes for current user, with filtering/sorting options.
 - `q`: search by title substring
 - `sort`: 'created', '-created', 'title', '-title'
 - `limit`: Limit results (default 20)
+- `after`: Cursor for the next page, taken from the previous response's `X-Next-Cursor` header
 """)
-def list_notes(
-    db: Session = Depends(get_db),
+async def list_notes(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     q: Optional[str] = Query(None, description="Search query for titles"),
     sort: Optional[str] = Query("created", description="Sort by (created/title, prefix with '-' for descending)"),
-    limit: int = Query(20, gt=0, le=100)
+    limit: int = Query(20, gt=0, le=100),
+    after: Optional[str] = Query(None, description="Page cursor from a previous X-Next-Cursor header"),
 ):
     """List/filter/sort notes for the user."""
-    query = db.query(Note).filter(Note.owner_id == current_user.id)
+    sort = sort or '-created'
+    if sort.lstrip('-') not in _NOTE_SORT_COLUMNS:
+        raise HTTPException(400, detail="Invalid sort key")
+    params = {"owner_id": current_user.id, "limit": limit}
     if q:
-        query = query.filter(Note.title.ilike(f"%{q}%"))
-    if sort:
-        if sort.lstrip('-') not in ('created', 'title'):
-            raise HTTPException(400, detail="Invalid sort key")
-        direction = -1 if sort.startswith('-') else 1
-        if sort.lstrip('-') == 'created':
-            order = Note.created_at.desc() if direction == -1 else Note.created_at
-        else:
-            order = Note.title.desc() if direction == -1 else Note.title
-        query = query.order_by(order)
-    else:
-        query = query.order_by(Note.created_at.desc())
-    notes = query.limit(limit).all()
-    return notes
+        params["pattern"] = f"%{q}%"
+    if after:
+        params["after_value"], params["after_id"] = _decode_cursor(after, sort)
+    stmt = _list_notes_statement(sort, bool(q), bool(after))
+    notes = (await db.execute(stmt, params)).scalars().all()
+    headers = {"X-Next-Cursor": _encode_cursor(notes[-1], sort)} if len(notes) == limit else None
+    # Serialize the whole list in pydantic-core rather than per item in FastAPI.
+    content = NoteListAdapter.dump_json(NoteListAdapter.validate_python(notes, from_attributes=True))
+    return Response(content=content, media_type="application/json", headers=headers)
 
 # PUBLIC_INTERFACE
 @app.get("/notes/{note_id}", response_model=NoteOut, tags=["notes"],
          summary="Get a note",
          description="Return a single note owned by current user.")
-def get_note(
+async def get_note(
     note_id: int = Path(..., title="The ID of the note"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Get a note by ID if owned by current user."""
-    note = db.query(Note).filter(Note.id == note_id, Note.owner_id == current_user.id).first()
-    if not note:
+    note = await db.get(Note, note_id)
+    if note is None or note.owner_id != current_user.id:
         raise HTTPException(status_code=404, detail="Note not found")
     return note
 
@@ -185,38 +257,45 @@ def get_note(
 @app.put("/notes/{note_id}", response_model=NoteOut, tags=["notes"],
          summary="Update note",
          description="Update an existing note (owner only).")
-def update_note(
+async def update_note(
     note_id: int,
     note_in: NoteUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Update note fields if owned by current user."""
-    note = db.query(Note).filter(Note.id == note_id, Note.owner_id == current_user.id).first()
-    if not note:
+    changes = note_in.model_dump(exclude_none=True)
+    if not changes:
+        note = await db.get(Note, note_id)
+        if note is None or note.owner_id != current_user.id:
+            raise HTTPException(404, detail="Note not found")
+        return note
+    # Ownership check, update and read-back in a single UPDATE ... RETURNING.
+    note = (await db.execute(
+        update(Note)
+        .where(Note.id == note_id, Note.owner_id == current_user.id)
+        .values(**changes)
+        .returning(Note)
+    )).scalar_one_or_none()
+    if note is None:
         raise HTTPException(404, detail="Note not found")
-    if note_in.title is not None:
-        note.title = note_in.title
-    if note_in.content is not None:
-        note.content = note_in.content
-    db.commit()
-    db.refresh(note)
+    await db.commit()
     return note
 
 # PUBLIC_INTERFACE
 @app.delete("/notes/{note_id}", response_model=Message, tags=["notes"],
             summary="Delete note",
             description="Delete a note by ID (owner only).")
-def delete_note(
+async def delete_note(
     note_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Delete a note by ID if owned by current user."""
-    note = db.query(Note).filter(Note.id == note_id, Note.owner_id == current_user.id).first()
-    if not note:
+    note = await db.get(Note, note_id)
+    if note is None or note.owner_id != current_user.id:
         raise HTTPException(404, detail="Note not found")
-    db.delete(note)
-    db.commit()
+    await db.delete(note)
+    await db.commit()
     return {"detail": "Note deleted."}
 
@@ -1,14 +1,15 @@
 from logging.config import fileConfig
+import asyncio
 import os
 
-from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-from api import models  # noqa
+from api import database, models  # noqa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -32,17 +33,36 @@ def run_migrations_offline():
     with context.begin_transaction():
         context.run_migrations()
 
-def run_migrations_online():
-    url = get_url()
-    connectable = engine_from_config(
-        {"sqlalchemy.url": url},
+def include_object(obj, name, type_, reflected, compare_to):
+    # Skip dialect-specific schema items (declared with .ddl_if) when autogenerating for other backends.
+    ddl_if = getattr(obj, "_ddl_if", None)
+    return ddl_if is None or ddl_if.dialect in (None, context.get_context().dialect.name)
+
+def do_run_migrations(connection):
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
+    with context.begin_transaction():
+        context.run_migrations()
+
+async def run_async_migrations():
+    # Same URL as offline mode, mapped to the app's asyncio driver (asyncpg/aiosqlite).
+    url = database.to_async_url(get_url())
+    connectable = async_engine_from_config(
+        {"sqlalchemy.url": url.render_as_string(hide_password=False)},
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
-    with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-        with context.begin_transaction():
-            context.run_migrations()
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
+
+def run_migrations_online():
+    # Callers running migrations in a loop (test fixtures) can hand in an open (sync)
+    # connection via Config.attributes["connection"] and skip connecting altogether.
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+    asyncio.run(run_async_migrations())
 
 if context.is_offline_mode():
     run_migrations_offline()
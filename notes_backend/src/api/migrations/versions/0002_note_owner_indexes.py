@@ -0,0 +1,23 @@
+"""Composite indexes for per-owner note listing
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_notes_owner_created", "notes", ["owner_id", sa.text("created_at DESC")])
+    op.create_index("ix_notes_owner_title", "notes", ["owner_id", "title"])
+
+
+def downgrade():
+    op.drop_index("ix_notes_owner_title", table_name="notes")
+    op.drop_index("ix_notes_owner_created", table_name="notes")
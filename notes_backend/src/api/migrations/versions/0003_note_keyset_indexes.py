@@ -0,0 +1,27 @@
+"""Add id tie-breaker to note listing indexes for keyset pagination
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index("ix_notes_owner_title", table_name="notes")
+    op.drop_index("ix_notes_owner_created", table_name="notes")
+    op.create_index("ix_notes_owner_created", "notes", ["owner_id", sa.text("created_at DESC"), sa.text("id DESC")])
+    op.create_index("ix_notes_owner_title", "notes", ["owner_id", "title", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_notes_owner_title", table_name="notes")
+    op.drop_index("ix_notes_owner_created", table_name="notes")
+    op.create_index("ix_notes_owner_created", "notes", ["owner_id", sa.text("created_at DESC")])
+    op.create_index("ix_notes_owner_title", "notes", ["owner_id", "title"])
@@ -1,6 +1,6 @@
 """Database models for the notes app (users and notes)"""
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -34,3 +34,13 @@ class Note(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     owner = relationship("User", back_populates="notes")
+
+    # Cover list_notes: owner filter + ORDER BY (created_at|title, id) + keyset LIMIT as an index range scan.
+    __table_args__ = (
+        Index("ix_notes_owner_created", owner_id, created_at.desc(), id.desc()),
+        Index("ix_notes_owner_title", owner_id, title, id),
+        # Trigram index so list_notes' ILIKE '%q%' search avoids a scan (Postgres + pg_trgm only).
+        Index(
+            "ix_notes_title_trgm", title, postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
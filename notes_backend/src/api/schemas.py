@@ -1,9 +1,9 @@
 """Pydantic schemas for the notes app REST API"""
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
 
 
 # -------------------
@@ -26,8 +26,7 @@ class UserOut(UserBase):
     id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # -------------------
@@ -73,8 +72,12 @@ class NoteOut(NoteBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Validates and serializes a whole list of notes in one pydantic-core call.
+# PUBLIC_INTERFACE
+NoteListAdapter = TypeAdapter(List[NoteOut])
 
 
 # -------------------
@@ -0,0 +1,76 @@
+"""Keyset pagination of GET /notes/ (cursor encoding, id tie-breaks, bad cursors)."""
+
+import base64
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from src.api.main import app
+from src.api.models import Base
+
+TITLES = ["b", "a", "b", "c", "a"]
+
+
+@pytest.fixture(scope="module")
+def notes_client():
+    sync_engine = create_engine(os.environ["DATABASE_URL"])
+    Base.metadata.create_all(sync_engine)
+    with TestClient(app) as client:
+        client.post("/auth/register", json={"username": "pager", "email": "pager@example.com",
+                                            "password": "password123"})
+        token = client.post("/auth/token", data={"username": "pager", "password": "password123"}).json()
+        client.headers["Authorization"] = f"Bearer {token['access_token']}"
+        notes = [client.post("/notes/", json={"title": title}).json() for title in TITLES]
+        # Every row shares one created_at, so only the id tie-breaker orders them.
+        with sync_engine.begin() as conn:
+            conn.execute(text("UPDATE notes SET created_at = '2026-01-01 00:00:00'"))
+        yield client, notes
+    sync_engine.dispose()
+
+
+def _expected_ids(notes, sort):
+    if sort.lstrip("-") == "created":
+        ordered = sorted(notes, key=lambda n: n["id"])
+    else:
+        ordered = sorted(notes, key=lambda n: (n["title"], n["id"]))
+    if sort.startswith("-"):
+        ordered.reverse()
+    return [n["id"] for n in ordered]
+
+
+@pytest.mark.parametrize("sort", ["created", "-created", "title", "-title"])
+def test_pages_cover_every_note_once_in_order(notes_client, sort):
+    client, notes = notes_client
+    ids, cursor = [], None
+    for _ in range(len(notes)):
+        params = {"sort": sort, "limit": 2}
+        if cursor:
+            params["after"] = cursor
+        response = client.get("/notes/", params=params)
+        assert response.status_code == 200
+        ids += [n["id"] for n in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert cursor is None
+    assert ids == _expected_ids(notes, sort)
+
+
+def _cursor(raw):
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+@pytest.mark.parametrize("cursor", [
+    "!!!",
+    _cursor("not-a-date|1"),
+    _cursor("2026-01-01T00:00:00|x"),
+    _cursor("2026-01-01T00:00:00|0"),
+    _cursor("2026-01-01T00:00:00|99999999999999999999999"),
+])
+def test_malformed_cursor_returns_400(notes_client, cursor):
+    client, _ = notes_client
+    response = client.get("/notes/", params={"sort": "-created", "after": cursor})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}